@@ -1,50 +1,218 @@
 import streamlit as st
 import pandas as pd
-import openai
+import aiohttp
+import asyncio
 import boto3
+import json
 import os
+import threading
+from functools import lru_cache
+from openai import (
+    APIConnectionError,
+    AsyncOpenAI,
+    InternalServerError,
+    OpenAI,
+    RateLimitError,
+)
+from botocore.config import Config
 from botocore.exceptions import NoCredentialsError
 
-# Set OpenAI API key from secrets
-openai.api_key = st.secrets["OPENAI_API_KEY"]
-
 # Set up AWS credentials from secrets (these are read from the .streamlit/secrets.toml)
 aws_access_key_id = st.secrets["AWS_ACCESS_KEY_ID"]
 aws_secret_access_key = st.secrets["AWS_SECRET_ACCESS_KEY"]
 aws_region = st.secrets["AWS_REGION"]
 bucket_name = st.secrets["AWS_S3_BUCKET_NAME"]
 
-# Set up S3 client
-s3_client = boto3.client(
-    's3',
-    aws_access_key_id=aws_access_key_id,
-    aws_secret_access_key=aws_secret_access_key,
-    region_name=aws_region
-)
+# Long-lived event loop shared by every rerun; the async OpenAI client's
+# connection pool is bound to the loop it first ran on, so it must not change
+@st.cache_resource
+def get_event_loop():
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return loop
+
+# Run a coroutine on the shared event loop and wait for its result
+def run_async(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop()).result()
+
+# Limits for OpenAI calls made from the shared event loop
+MAX_CONCURRENT_REQUESTS = 8
+MAX_ATTEMPTS = 3
+REQUEST_TIMEOUT = 30
+
+async def create_semaphore():
+    return asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+
+# Created on the shared loop so fan-out from every rerun shares one limit
+@st.cache_resource
+def get_openai_semaphore():
+    return run_async(create_semaphore())
+
+async def create_aiohttp_session():
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=100, keepalive_timeout=75, ttl_dns_cache=300
+        ),
+        headers={"Authorization": f"Bearer {st.secrets['OPENAI_API_KEY']}"},
+        timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    )
+
+# Raw HTTP session for bulk scoring, which scales better than the SDK's
+# httpx client at high fan-out; it lives for the whole process
+@st.cache_resource
+def get_aiohttp_session():
+    return run_async(create_aiohttp_session())
+
+# Clients are cached as resources so reruns don't rebuild them; retries for
+# the async client are handled in get_deal_insights
+@st.cache_resource
+def get_openai_client():
+    return AsyncOpenAI(api_key=st.secrets["OPENAI_API_KEY"], max_retries=0)
+
+# Synchronous client for Batch API bookkeeping (file upload, batch create/poll)
+@st.cache_resource
+def get_batch_client():
+    return OpenAI(api_key=st.secrets["OPENAI_API_KEY"], max_retries=3)
+
+@st.cache_resource
+def get_boto_session():
+    return boto3.session.Session(
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=aws_region
+    )
+
+# Pooled connections are kept alive across reruns, so repeat S3 calls skip
+# the TCP/TLS handshake
+@st.cache_resource
+def get_s3_client():
+    return get_boto_session().client(
+        's3',
+        config=Config(
+            max_pool_connections=50,
+            retries={"max_attempts": 3, "mode": "adaptive"}
+        )
+    )
+
+client = get_openai_client()
+openai_semaphore = get_openai_semaphore()
+http_session = get_aiohttp_session()
+batch_client = get_batch_client()
+s3_client = get_s3_client()
+
+# Compact dtypes for the columns every catalog shares
+CATALOG_DTYPES = {
+    "Minimum Order Quantity": "int32",
+    "Payment Terms": "category"
+}
+
+# Read a catalog from its Parquet copy. The copy is (re)written from the CSV
+# when it is missing or older than the CSV, so the first process after a
+# deploy or a CSV edit converts it and later cold starts read Parquet
+def read_catalog(name):
+    csv_path = f"{name}.csv"
+    parquet_path = f"{name}.parquet"
+    if (os.path.exists(parquet_path)
+            and os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(parquet_path, engine="pyarrow").astype(CATALOG_DTYPES)
+
+    df = pd.read_csv(csv_path, dtype=CATALOG_DTYPES)
+    try:
+        df.to_parquet(parquet_path, engine="pyarrow", index=False)
+    except OSError:
+        # Read-only checkout; keep serving from the CSV
+        pass
+    return df
 
 # Load static product data (this will be used as a fallback)
-base_df = pd.read_csv("Base.csv")
-apparel_df = pd.read_csv("Apparel.csv")
-construction_df = pd.read_csv("Construction.csv")
-energy_df = pd.read_csv("Energy.csv")
-hospitality_df = pd.read_csv("Hospitality.csv")
-transportation_df = pd.read_csv("Transportation.csv")
+# Cached so reruns triggered by widget interactions reuse the parsed frames
+@st.cache_data
+def load_industry_data():
+    # Categorical keeps the deduplicated product list (in file order) on hand
+    base = read_catalog("Base")
+    base["Base Name"] = base["Base Name"].astype(
+        pd.CategoricalDtype(base["Base Name"].unique())
+    )
+    return {
+        "Base": base,
+        "Apparel": read_catalog("Apparel"),
+        "Construction": read_catalog("Construction"),
+        "Energy": read_catalog("Energy"),
+        "Hospitality": read_catalog("Hospitality"),
+        "Transportation": read_catalog("Transportation")
+    }
+
+industry_data = load_industry_data()
+base_df = industry_data["Base"]
 
 industry_dfs = {
-    "Apparel": apparel_df,
-    "Construction": construction_df,
-    "Energy": energy_df,
-    "Hospitality": hospitality_df,
-    "Transportation": transportation_df
+    "Apparel": industry_data["Apparel"],
+    "Construction": industry_data["Construction"],
+    "Energy": industry_data["Energy"],
+    "Hospitality": industry_data["Hospitality"],
+    "Transportation": industry_data["Transportation"]
 }
 
+# Stack every industry table into one frame keyed by (Industry, Base Name),
+# pairing each base product with its first matching industry row, so a
+# recommendation is a single index lookup instead of a prefix scan per click
+@st.cache_data
+def load_industry_table():
+    data = load_industry_data()
+    rows = []
+    for industry in industry_dfs:
+        df = data[industry]
+        names = df.iloc[:, 0]
+        for name in data["Base"]["Base Name"]:
+            # Blank names in the industry CSVs never match
+            mask = names.str.startswith(name, na=False)
+            if mask.any():
+                match = df.loc[mask.idxmax()]
+                rows.append({
+                    "Industry": industry,
+                    "Base Name": name,
+                    "Recommended Product": match.iloc[0],
+                    "Recommended Code": match.iloc[1],
+                    "Minimum Order Quantity": match["Minimum Order Quantity"],
+                    "Payment Terms": match["Payment Terms"]
+                })
+
+    table = pd.DataFrame(rows).astype(CATALOG_DTYPES)
+    table["Industry"] = table["Industry"].astype("category")
+    return table.set_index(["Industry", "Base Name"]).sort_index()
+
+industry_table = load_industry_table()
+
+# Base catalog keyed by product name for direct row lookups
+@st.cache_data
+def load_base_index():
+    return load_industry_data()["Base"].set_index("Base Name")
+
+base_index = load_base_index()
+
 # Check if Salesforce-uploaded CSV exists in S3
 uploaded_csv_path = "uploaded_from_salesforce.csv"
 uploaded_df = None
 
+# Cached per ETag, so a new upload is picked up as soon as it lands; only the
+# latest few uploads are kept. The object body is streamed straight into
+# pandas without touching disk
+@st.cache_data(max_entries=3)
+def load_salesforce_data(bucket, key, etag):
+    obj = s3_client.get_object(Bucket=bucket, Key=key, IfMatch=etag)
+    return pd.read_csv(obj["Body"])
+
+# Reruns only send a HEAD request; the object is read again only when its ETag
+# differs from the one this session last loaded
+def get_salesforce_data(bucket, key):
+    etag = s3_client.head_object(Bucket=bucket, Key=key)["ETag"]
+    if st.session_state.get("sf_etag") != etag:
+        st.session_state["sf_df"] = load_salesforce_data(bucket, key, etag)
+        st.session_state["sf_etag"] = etag
+    return st.session_state["sf_df"]
+
 try:
-    s3_client.download_file(bucket_name, uploaded_csv_path, uploaded_csv_path)
-    uploaded_df = pd.read_csv(uploaded_csv_path)
+    uploaded_df = get_salesforce_data(bucket_name, uploaded_csv_path)
     st.sidebar.success("Salesforce data loaded successfully from S3.")
     st.sidebar.dataframe(uploaded_df.head())
 except NoCredentialsError:
@@ -53,15 +221,17 @@ except Exception as e:
     st.sidebar.warning(f"Error loading Salesforce data: {str(e)}")
 
 # Function to generate recommendation based on product and industry
+@st.cache_data(show_spinner=False)
 def get_recommendation(product_name, industry):
     # Check for the product in base data
-    base_product = base_df[base_df["Base Name"] == product_name]
-    if base_product.empty:
+    try:
+        base_product = base_index.loc[product_name]
+    except KeyError:
         return None
 
-    base_code = base_product["Base Code"].values[0]
-    base_moq = base_product["Minimum Order Quantity"].values[0]
-    base_terms = base_product["Payment Terms"].values[0]
+    base_code = base_product["Base Code"]
+    base_moq = base_product["Minimum Order Quantity"]
+    base_terms = base_product["Payment Terms"]
 
     reco_product = product_name
     reco_code = base_code
@@ -69,14 +239,14 @@ def get_recommendation(product_name, industry):
     terms = base_terms
 
     # If the industry is found, match with the respective data
-    if industry in industry_dfs:
-        df = industry_dfs[industry]
-        match = df[df[df.columns[0]].str.startswith(product_name)]
-        if not match.empty:
-            reco_product = match[match.columns[0]].values[0]
-            reco_code = match[match.columns[1]].values[0]
-            moq = match["Minimum Order Quantity"].values[0]
-            terms = match["Payment Terms"].values[0]
+    try:
+        match = industry_table.loc[(industry, product_name)]
+        reco_product = match["Recommended Product"]
+        reco_code = match["Recommended Code"]
+        moq = match["Minimum Order Quantity"]
+        terms = match["Payment Terms"]
+    except KeyError:
+        pass
 
     return {
         "Product": product_name,
@@ -87,12 +257,11 @@ def get_recommendation(product_name, industry):
         "Payment Terms": terms
     }
 
-# Function to get insights using LLM (OpenAI API)
-def get_deal_insights(product, industry, moq, payment_terms):
-    prompt = f"""
+# Prompt template for deal insights, filled in by build_insight_prompt
+INSIGHT_PROMPT_TEMPLATE = """
     Product: {product}
     Industry: {industry}
-    Recommended Product: {product}-{industry[0].upper()}
+    Recommended Product: {product}-{industry_code}
     Minimum Order Quantity: {moq}
     Payment Terms: {payment_terms}
 
@@ -108,32 +277,314 @@ def get_deal_insights(product, industry, moq, payment_terms):
     Next Step: <action>
     """
 
-    response = openai.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[{"role": "user", "content": prompt}]
+# Industry suffix used in recommended product names, e.g. "Apparel" -> "A";
+# blank for Salesforce rows with no industry
+@lru_cache(maxsize=None)
+def get_industry_code(industry):
+    return industry[:1].upper()
+
+# Build the LLM prompt for a deal
+def build_insight_prompt(product, industry, moq, payment_terms):
+    return INSIGHT_PROMPT_TEMPLATE.format_map({
+        "product": product,
+        "industry": industry,
+        "industry_code": get_industry_code(industry),
+        "moq": moq,
+        "payment_terms": payment_terms
+    })
+
+# Function to get insights using LLM (OpenAI API)
+async def get_deal_insights(product, industry, moq, payment_terms):
+    prompt = build_insight_prompt(product, industry, moq, payment_terms)
+
+    # Bound concurrency and retry transient failures with exponential backoff;
+    # the semaphore is only held per attempt so backoff doesn't block others
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            async with openai_semaphore:
+                response = await client.chat.completions.create(
+                    model="gpt-3.5-turbo",
+                    messages=[{"role": "user", "content": prompt}],
+                    timeout=REQUEST_TIMEOUT
+                )
+            return response.choices[0].message.content
+        except (RateLimitError, APIConnectionError, InternalServerError):
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+        await asyncio.sleep(2 ** attempt)
+
+# Insight requests shared by every session, keyed by deal; a finished future
+# doubles as the result cache, so each deal is only sent to OpenAI once
+@st.cache_resource
+def get_insight_futures():
+    return {}, threading.Lock()
+
+insight_futures, insight_futures_lock = get_insight_futures()
+
+# Return the in-flight or finished request for a deal, and whether this call
+# started it; a request that already failed is replaced with a fresh one
+def get_insight_future(product, industry, moq, payment_terms):
+    key = (product, industry, moq, payment_terms)
+    with insight_futures_lock:
+        future = insight_futures.get(key)
+        if future is not None and not (future.done() and future.exception() is not None):
+            return future, False
+
+        future = asyncio.run_coroutine_threadsafe(
+            get_deal_insights(*key), get_event_loop()
+        )
+        insight_futures[key] = future
+    return future, True
+
+# Start generating insights for a selection before "Recommend" is clicked
+def prefetch_insights(product_name, industry):
+    rec = get_recommendation(product_name, industry)
+    if rec:
+        get_insight_future(
+            rec["Product"], rec["Industry"], rec["MOQ"], rec["Payment Terms"]
+        )
+
+# Wait for a deal's insights, so repeat clicks and prefetched deals don't
+# re-bill OpenAI. If a request started elsewhere (e.g. a prefetch) fails, a
+# fresh one is sent; only a failure of a request made here reaches the caller
+def get_cached_deal_insights(product, industry, moq, payment_terms):
+    key = (product, industry, moq, payment_terms)
+    while True:
+        future, started = get_insight_future(*key)
+        try:
+            return future.result()
+        except Exception:
+            with insight_futures_lock:
+                if insight_futures.get(key) is future:
+                    del insight_futures[key]
+            if started:
+                raise
+
+# Bulk variant of get_deal_insights that posts to the API directly with aiohttp
+async def get_deal_insights_raw(product, industry, moq, payment_terms):
+    prompt = build_insight_prompt(product, industry, moq, payment_terms)
+    payload = {
+        "model": "gpt-3.5-turbo",
+        "messages": [{"role": "user", "content": prompt}]
+    }
+
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            async with openai_semaphore:
+                async with http_session.post(
+                    "https://api.openai.com/v1/chat/completions", json=payload
+                ) as resp:
+                    resp.raise_for_status()
+                    result = await resp.json()
+            return result["choices"][0]["message"]["content"]
+        except aiohttp.ClientResponseError as e:
+            if (e.status != 429 and e.status < 500) or attempt == MAX_ATTEMPTS - 1:
+                raise
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+        await asyncio.sleep(2 ** attempt)
+
+# Fire several insight requests concurrently so their network waits overlap;
+# a failed request becomes an error message for its row instead of sinking the run
+async def get_many_insights(rows):
+    results = await asyncio.gather(
+        *[get_deal_insights_raw(**r) for r in rows], return_exceptions=True
+    )
+    return [
+        f"Error generating insights: {str(r)}" if isinstance(r, Exception) else r
+        for r in results
+    ]
+
+# A Salesforce cell counts as filled in when it is neither NaN nor blank
+def is_filled(value):
+    return pd.notna(value) and value != ""
+
+# Pull the product and industry out of a Salesforce row
+def get_salesforce_fields(row):
+    product = next(
+        (v for v in (row.get("Base Name"), row.get("Product")) if is_filled(v)), ""
     )
+    industry = row.get("Industry")
+    return product, industry if is_filled(industry) else ""
 
-    return response.choices[0].message.content
+# Column-wise get_salesforce_fields for a whole Salesforce frame
+def get_salesforce_columns(df):
+    product = pd.Series("", index=df.index, dtype=object)
+    for col in ["Product", "Base Name"]:
+        if col in df.columns:
+            values = df[col]
+            product = values.where(values.notna() & (values != ""), product)
+
+    industry = pd.Series("", index=df.index, dtype=object)
+    if "Industry" in df.columns:
+        values = df["Industry"]
+        industry = values.where(values.notna() & (values != ""), industry)
+
+    return pd.DataFrame({"Product": product, "Industry": industry})
+
+# Vectorised get_recommendation for every Salesforce row: one join against the
+# base catalog and one against the industry table instead of a lookup per row.
+# Unmatched rows are dropped; the index is kept so results line up with df
+def recommend_salesforce_rows(df):
+    base = base_index.rename(columns={
+        "Minimum Order Quantity": "Base MOQ",
+        "Payment Terms": "Base Terms"
+    })
+    recs = get_salesforce_columns(df).join(base, on="Product", how="inner")
+    recs = recs.join(industry_table, on=["Industry", "Product"], how="left")
+
+    return pd.DataFrame({
+        "Product": recs["Product"],
+        "Industry": recs["Industry"],
+        "Recommended Product": recs["Recommended Product"].fillna(recs["Product"]),
+        "Recommended Code": recs["Recommended Code"].fillna(recs["Base Code"]),
+        "MOQ": recs["Minimum Order Quantity"].fillna(recs["Base MOQ"]).astype(int),
+        "Payment Terms": recs["Payment Terms"].astype(object).fillna(
+            recs["Base Terms"].astype(object)
+        )
+    })
+
+# The prompt depends only on these fields, so rows sharing them share an insight
+INSIGHT_KEY = ["Product", "Industry", "MOQ", "Payment Terms"]
+
+# Spread insights generated for the unique deals back onto every matching row
+def broadcast_insights(recs, unique_recs, insights):
+    keyed = pd.Series(
+        list(insights),
+        index=pd.MultiIndex.from_frame(unique_recs[INSIGHT_KEY]),
+        name="Deal Insights",
+        dtype=object
+    )
+    return recs.join(keyed, on=INSIGHT_KEY)["Deal Insights"]
+
+# Submit insight prompts for every distinct Salesforce deal through the Batch
+# API; each request's custom_id is the index of the first row with that deal.
+# The submitted deals are returned with the batch, because the Salesforce data
+# may be replaced before the batch finishes
+def submit_insights_batch(df):
+    unique_recs = recommend_salesforce_rows(df).drop_duplicates(INSIGHT_KEY)
+    lines = []
+    for idx, rec in unique_recs.iterrows():
+        prompt = build_insight_prompt(
+            rec["Product"], rec["Industry"], rec["MOQ"], rec["Payment Terms"]
+        )
+        lines.append(json.dumps({
+            "custom_id": str(idx),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": "gpt-3.5-turbo",
+                "messages": [{"role": "user", "content": prompt}]
+            }
+        }))
+
+    if not lines:
+        return None, unique_recs
+
+    batch_file = batch_client.files.create(
+        file=("salesforce_insights.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = batch_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    return batch, unique_recs
+
+# Generate insights for every matched Salesforce row right away
+def score_salesforce_rows(df):
+    recs = recommend_salesforce_rows(df)
+    unique_recs = recs.drop_duplicates(INSIGHT_KEY)
+    rows = [
+        {"product": product, "industry": industry, "moq": moq, "payment_terms": terms}
+        for product, industry, moq, terms in zip(
+            unique_recs["Product"], unique_recs["Industry"],
+            unique_recs["MOQ"], unique_recs["Payment Terms"]
+        )
+    ]
+    insights = run_async(get_many_insights(rows))
+
+    results_df = df.copy()
+    results_df["Deal Insights"] = broadcast_insights(recs, unique_recs, insights)
+    return results_df
+
+# Batch statuses after which the batch will not change any more
+BATCH_FINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+# Turn one line of a batch output or error file into the row's insight text
+def read_batch_result(result):
+    response = result.get("response") or {}
+    body = response.get("body") or {}
+    if response.get("status_code") == 200:
+        return body["choices"][0]["message"]["content"]
+
+    error = result.get("error") or body.get("error") or {}
+    message = error.get("message") or f"status {response.get('status_code')}"
+    return f"Error generating insights: {message}"
+
+# Read a finished batch's output and error files, match them to the deals that
+# were submitted and broadcast them onto the current Salesforce rows by deal;
+# deals with no result line get the batch's final status as their error
+def fetch_batch_insights(batch, batch_recs, df):
+    insights = {}
+    for file_id in (batch.error_file_id, batch.output_file_id):
+        if not file_id:
+            continue
+        for line in batch_client.files.content(file_id).text.splitlines():
+            result = json.loads(line)
+            insights[result["custom_id"]] = read_batch_result(result)
+
+    missing = f"Error generating insights: batch {batch.status}"
+    results_df = df.copy()
+    results_df["Deal Insights"] = broadcast_insights(
+        recommend_salesforce_rows(df),
+        batch_recs,
+        [insights.get(str(idx), missing) for idx in batch_recs.index]
+    )
+    return results_df
+
+# Widget callbacks that prefetch insights for the new selection
+def prefetch_selected_insights():
+    prefetch_insights(
+        st.session_state["selected_product"], st.session_state["selected_industry"]
+    )
+
+def prefetch_salesforce_insights():
+    row = uploaded_df.iloc[st.session_state["selected_uploaded_row"]]
+    prefetch_insights(*get_salesforce_fields(row))
 
 # Streamlit UI
 st.title("Product Recommendation Engine")
 
 # Allow user to choose product and industry from static data
-selected_product = st.selectbox("Select a Product", base_df["Base Name"].unique())
-selected_industry = st.radio("Select Industry", list(industry_dfs.keys()))
+selected_product = st.selectbox(
+    "Select a Product",
+    base_df["Base Name"].cat.categories,
+    key="selected_product",
+    on_change=prefetch_selected_insights
+)
+selected_industry = st.radio(
+    "Select Industry",
+    list(industry_dfs.keys()),
+    key="selected_industry",
+    on_change=prefetch_selected_insights
+)
 
 # Check if Salesforce-uploaded data exists
 if uploaded_df is not None:
     st.subheader("Salesforce Product Data")
     selected_uploaded_row = st.selectbox(
         "Select a row from Salesforce data for recommendation",
-        uploaded_df.index
+        uploaded_df.index,
+        key="selected_uploaded_row",
+        on_change=prefetch_salesforce_insights
     )
 
     # Get the product and industry from the selected row
     row = uploaded_df.iloc[selected_uploaded_row]
-    salesforce_product = row.get("Base Name") or row.get("Product") or ""
-    salesforce_industry = row.get("Industry") or ""
+    salesforce_product, salesforce_industry = get_salesforce_fields(row)
 
     # Provide option to run recommendation based on Salesforce data
     if st.button("Run Recommendation for Salesforce Data"):
@@ -143,7 +594,7 @@ if uploaded_df is not None:
             st.write(rec)
 
             with st.spinner("Generating insights..."):
-                insights = get_deal_insights(
+                insights = get_cached_deal_insights(
                     rec["Product"], rec["Industry"], rec["MOQ"], rec["Payment Terms"]
                 )
             st.subheader("Deal Insights")
@@ -151,6 +602,53 @@ if uploaded_df is not None:
         else:
             st.error("Salesforce product not matched in base data.")
 
+    # Score every Salesforce row now, with concurrent requests
+    if st.button("Generate insights now for all Salesforce rows"):
+        try:
+            with st.spinner("Generating insights..."):
+                results_df = score_salesforce_rows(uploaded_df)
+            st.subheader("Salesforce Deal Insights")
+            st.dataframe(results_df)
+        except Exception as e:
+            st.error(f"Error generating insights: {str(e)}")
+
+    # Score every Salesforce row at once through the OpenAI Batch API
+    if st.button("Batch insights for all Salesforce rows"):
+        try:
+            batch, batch_recs = submit_insights_batch(uploaded_df)
+            if batch:
+                st.session_state["batch_id"] = batch.id
+                st.session_state["batch_recs"] = batch_recs
+                st.session_state["batch_status"] = batch.status
+                st.session_state["batch_results"] = None
+            else:
+                st.error("No Salesforce products matched in base data.")
+        except Exception as e:
+            st.error(f"Error submitting batch: {str(e)}")
+
+    # The batch is only polled on request until it finishes, and its results
+    # are fetched once
+    if "batch_id" in st.session_state:
+        if st.session_state["batch_results"] is None:
+            if st.button("Refresh batch status"):
+                try:
+                    batch = batch_client.batches.retrieve(st.session_state["batch_id"])
+                    st.session_state["batch_status"] = batch.status
+                    if batch.status in BATCH_FINAL_STATUSES:
+                        st.session_state["batch_results"] = fetch_batch_insights(
+                            batch, st.session_state["batch_recs"], uploaded_df
+                        )
+                except Exception as e:
+                    st.error(f"Error checking batch: {str(e)}")
+
+        st.write(
+            f"Batch {st.session_state['batch_id']} status: "
+            f"{st.session_state['batch_status']}"
+        )
+        if st.session_state["batch_results"] is not None:
+            st.subheader("Batch Deal Insights")
+            st.dataframe(st.session_state["batch_results"])
+
 # Allow user to manually run recommendations with static data
 if st.button("Recommend"):
     rec = get_recommendation(selected_product, selected_industry)
@@ -159,7 +657,7 @@ if st.button("Recommend"):
         st.write(rec)
 
         with st.spinner("Generating insights..."):
-            insights = get_deal_insights(
+            insights = get_cached_deal_insights(
                 rec["Product"], rec["Industry"], rec["MOQ"], rec["Payment Terms"]
             )
         st.subheader("Deal Insights")